@@ -9,8 +9,12 @@ Supports:
 
 import streamlit as st
 import streamlit.components.v1 as components
+import httpx
 import asyncio
-import json
+import logging
+import orjson
+import threading
+from collections import deque
 from typing import Optional
 
 from services.anam_service import anam_service
@@ -18,6 +22,11 @@ from services.tools_service import mem0_service
 from services.voice_service import voice_service
 from services.llm_service import llm_service
 from config.settings import settings
+from config.logging_setup import setup_logging
+from config.ui import AGENTS_INFO, APP_CSS, FEATURES_OVERVIEW
+
+setup_logging(settings.log_level)
+logger = logging.getLogger(__name__)
 
 # ========================
 # PAGE CONFIG
@@ -36,34 +45,72 @@ st.caption("Supervisor-Orchestrated Specialized Agents with Multi-Modal Interact
 # STYLING
 # ========================
 
-st.markdown("""
-<style>
-    .main > div {
-        padding-top: 2rem;
-    }
-    .stButton button {
-        width: 100%;
-    }
-    .agent-badge {
-        display: inline-block;
-        padding: 0.5rem 1rem;
-        border-radius: 0.5rem;
-        font-size: 0.9rem;
-        font-weight: 600;
-    }
-    .agent-research { background: #e8f4f8; color: #0288d1; }
-    .agent-finance { background: #f3e5f5; color: #7b1fa2; }
-    .agent-travel { background: #e8f5e9; color: #388e3c; }
-    .agent-shopping { background: #fff3e0; color: #f57c00; }
-    .agent-jobs { background: #fce4ec; color: #c2185b; }
-    .agent-recipes { background: #f1f8e9; color: #558b2f; }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(APP_CSS, unsafe_allow_html=True)
+
+# ========================
+# ASYNC RUNTIME
+# ========================
+
+@st.cache_resource
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Start one background event loop shared by every rerun."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+
+def run_async(coro):
+    """Run a coroutine on the background loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
+
+
+def iter_async(agen):
+    """Iterate an async generator on the background loop from the script thread."""
+    loop = get_loop()
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(anext(agen), loop).result()
+        except StopAsyncIteration:
+            return
+
+
+@st.cache_resource
+def get_http_client():
+    """Shared keep-alive client for backend requests (bound to the background loop)."""
+    return httpx.AsyncClient(
+        timeout=180.0,
+        limits=httpx.Limits(max_keepalive_connections=8),
+    )
+
+
+def clear_server_history(session_id: str) -> bool:
+    """Drop the backend's history for a session so both sides reset together."""
+    async def _clear():
+        response = await get_http_client().delete(
+            f"http://localhost:8000/session/{session_id}"
+        )
+        response.raise_for_status()
+
+    try:
+        run_async(_clear())
+        return True
+    except Exception as e:
+        logger.warning("Could not clear backend session history: %s", e)
+        return False
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_memories(user_id: str, limit: int = 10):
+    """Fetch a user's Mem0 memories, cached per user for a short TTL."""
+    return run_async(mem0_service.retrieve_memories(user_id=user_id, limit=limit))
 
 # ========================
 # SESSION INITIALIZATION
 # ========================
 
+# Display cache of recent chat turns; full context lives in the backend session store
+MAX_HISTORY_MESSAGES = 20
+
 if "session_id" not in st.session_state:
     st.session_state.session_id = None
 if "user_id" not in st.session_state:
@@ -75,7 +122,7 @@ if "interaction_mode" not in st.session_state:
 if "user_memories" not in st.session_state:
     st.session_state.user_memories = []
 if "conversation_history" not in st.session_state:
-    st.session_state.conversation_history = []
+    st.session_state.conversation_history = deque(maxlen=MAX_HISTORY_MESSAGES)
 if "last_agent" not in st.session_state:
     st.session_state.last_agent = None
 if "last_processed_audio" not in st.session_state:
@@ -98,15 +145,14 @@ with st.sidebar:
         user_id = user_name.lower().replace(" ", "-")
         session_id = f"session-{user_id}"
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
         try:
-            # Create Zep user and thread
+            # Start from an empty server-side history as well
+            if not clear_server_history(session_id):
+                st.warning("Backend unreachable: previous conversation history may persist")
             
             # Initialize Mem0
             if settings.mem0_enabled:
-                loop.run_until_complete(
+                run_async(
                     mem0_service.add_memory(
                         user_id=user_id,
                         message=f"Session started for {user_name}",
@@ -117,7 +163,7 @@ with st.sidebar:
             st.session_state.user_id = user_id
             st.session_state.session_id = session_id
             st.session_state.anam_session_token = None
-            st.session_state.conversation_history = []
+            st.session_state.conversation_history = deque(maxlen=MAX_HISTORY_MESSAGES)
             st.session_state.user_memories = []
             
             st.success(f"✅ Session initialized for {user_name}!")
@@ -138,6 +184,8 @@ with st.sidebar:
         """)
         
         if st.button("End Session", type="secondary"):
+            clear_server_history(st.session_state.session_id)
+            st.session_state.conversation_history = deque(maxlen=MAX_HISTORY_MESSAGES)
             st.session_state.session_id = None
             st.session_state.user_id = None
             st.session_state.anam_session_token = None
@@ -218,9 +266,7 @@ if st.session_state.session_id:
             audio_id = hash(voice_audio.getvalue())
             if audio_id != st.session_state.last_processed_audio:
                 with st.spinner("Transcribing Voice..."):
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    transcription = loop.run_until_complete(
+                    transcription = run_async(
                         voice_service.transcribe_audio(voice_audio.getvalue())
                     )
                 
@@ -243,83 +289,66 @@ if st.session_state.session_id:
                 "content": user_input
             })
             
-            # Re-render to show user message immediately (optional, or just rely on loop next rerun)
-            # st.rerun() # Typically better to flow through, but Streamlit reruns on input.
-            # We are already in the rerun triggered by input.
-            # So just display it now visually or let the history loop handle it (it already ran above).
-            # We need to render it locally if history loop ran *before* we appended? Yes.
+            # The history loop above already ran for this rerun, so render the new
+            # turn inline instead of forcing a full script replay with st.rerun().
             st.chat_message("user").write(user_input)
             
             # Get response from backend
             try:
-                import httpx
-
-                # Show processing message
-                processing_placeholder = st.empty()
-                processing_placeholder.write("🤔 Processing...")
-
                 payload = {
                     "user_id": st.session_state.user_id,
                     "session_id": st.session_state.session_id,
                     "message": user_input,
                     "mode": "voice" if is_voice else "text",
-                    "conversation_history": [
-                        {"role": msg["role"], "content": msg["content"]}
-                        for msg in st.session_state.conversation_history[:-1]
-                    ]
                 }
 
                 # Stream from /multi-agent/stream endpoint
-                stream_state = {"text": "", "agent": "unknown"}
+                stream_state = {"agent": "unknown"}
 
-                async def stream_response():
+                async def stream_chunks():
                     try:
-                        async with httpx.AsyncClient(timeout=180.0) as client:
-                            async with client.stream(
-                                "POST",
-                                "http://localhost:8000/multi-agent/stream",
-                                json=payload
-                            ) as response:
-                                async for line in response.aiter_lines():
-                                    if line.startswith("data: "):
-                                        data = json.loads(line[6:])
-                                        if "content" in data:
-                                            stream_state["text"] += data.get("content", "")
-                                            stream_state["agent"] = data.get("agent", stream_state["agent"])
+                        client = get_http_client()
+                        async with client.stream(
+                            "POST",
+                            "http://localhost:8000/multi-agent/stream",
+                            json=payload
+                        ) as response:
+                            async for line in response.aiter_lines():
+                                if not line:
+                                    continue
+                                data = orjson.loads(line)
+                                if data.get("type") == "meta":
+                                    stream_state["agent"] = data.get("agent", stream_state["agent"])
+                                elif "content" in data:
+                                    yield data["content"]
                     except Exception as stream_error:
                         # Set a fallback response for testing
-                        stream_state["text"] = f"Backend connection failed: {stream_error}. This is a test response to verify the UI works."
                         stream_state["agent"] = "test_agent"
+                        yield f"Backend connection failed: {stream_error}. This is a test response to verify the UI works."
 
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(stream_response())
-
-                response_text = stream_state["text"]
-                agent_used = stream_state["agent"]
-
-                # Clear processing message and show simple response in chat
-                processing_placeholder.empty()
                 with st.chat_message("assistant"):
-                    st.write(f"Response from {agent_used} agent:")
-                    # Show a truncated preview
-                    preview = response_text[:200] + "..." if len(response_text) > 200 else response_text
-                    st.write(preview)
-                    if len(response_text) > 200:
-                        st.info("📋 Full response and audio available in tabs below")
-                    
+                    # Render tokens as they arrive from the backend; the placeholder
+                    # is cleared once the tabs below hold the full reply
+                    stream_box = st.empty()
+                    with stream_box.container():
+                        response_text = st.write_stream(iter_async(stream_chunks()))
+                    if not isinstance(response_text, str):
+                        response_text = "".join(str(part) for part in response_text)
+                    agent_used = stream_state["agent"]
+                    st.caption(f"Response from {agent_used} agent")
+
                     # Generate Summary for TTS and display
                     summary_text = ""
                     if response_text and response_text.strip():
                         with st.spinner("📝 Generating summary..."):
                             try:
-                                summary_text = loop.run_until_complete(
+                                summary_text = run_async(
                                     llm_service.summarize_text(response_text)
                                 )
                                 if not summary_text:
                                     summary_text = response_text[:300] + "..."
                             except Exception as sum_err:
-                                print(f"Summarization error: {sum_err}")
+                                logger.warning("Summarization error: %s", sum_err)
                                 summary_text = response_text[:300] + "..."
                     else:
                         summary_text = "No response received."
@@ -330,7 +359,7 @@ if st.session_state.session_id:
 
                     # Generate audio for summary
                     try:
-                        audio_bytes = loop.run_until_complete(
+                        audio_bytes = run_async(
                             voice_service.text_to_speech(summary_text)
                         )
                         tts_success = audio_bytes is not None and len(audio_bytes) >= 1000
@@ -356,6 +385,9 @@ if st.session_state.session_id:
                     with tab_det:
                         st.write(response_text)
 
+                    # Same layout as restored turns: the reply lives in Full Detail only
+                    stream_box.empty()
+
                     with tab_audio:
                         if audio_bytes and tts_success:
                             st.audio(audio_bytes, format="audio/mp3", autoplay=False)
@@ -411,41 +443,8 @@ if st.session_state.session_id:
     with tab_agents:
         st.subheader("🤖 Available Specialized Agents")
         
-        agents_info = {
-            "research": {
-                "icon": "🔍",
-                "description": "Web research, articles, and information gathering",
-                "tools": ["News search", "ChromaDB RAG", "Document retrieval"]
-            },
-            "finance": {
-                "icon": "💰",
-                "description": "Financial information, stocks, and investment advice",
-                "tools": ["Financial news", "Market data", "Investment guidance"]
-            },
-            "travel": {
-                "icon": "✈️",
-                "description": "Flights, hotels, and trip planning",
-                "tools": ["Flight search", "Hotel booking", "Travel guides"]
-            },
-            "shopping": {
-                "icon": "🛍️",
-                "description": "Product recommendations and shopping assistance",
-                "tools": ["Product search", "Price comparison", "Recommendations"]
-            },
-            "jobs": {
-                "icon": "💼",
-                "description": "Job search and career advice",
-                "tools": ["Google Jobs search", "Resume tips", "Career guidance"]
-            },
-            "recipes": {
-                "icon": "👨🍳",
-                "description": "Recipe discovery with ratings and ingredients",
-                "tools": ["Recipe search", "Ingredient lookup", "Cooking tips"]
-            }
-        }
-        
         cols = st.columns(2)
-        for idx, (agent_name, info) in enumerate(agents_info.items()):
+        for idx, (agent_name, info) in enumerate(AGENTS_INFO.items()):
             with cols[idx % 2]:
                 with st.container(border=True):
                     st.markdown(f"### {info['icon']} {agent_name.title()}")
@@ -464,17 +463,12 @@ if st.session_state.session_id:
         st.subheader("🧠 User Memories")
         
         if settings.mem0_enabled:
+            if st.button("🔄 Refresh Memories", key="refresh_memories"):
+                fetch_memories.clear()
+
             # Retrieve user memories
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
             try:
-                memories = loop.run_until_complete(
-                    mem0_service.retrieve_memories(
-                        user_id=st.session_state.user_id,
-                        limit=10
-                    )
-                )
+                memories = fetch_memories(st.session_state.user_id, limit=10)
                 
                 if memories:
                     st.write(f"📚 Found {len(memories)} memories:")
@@ -567,9 +561,7 @@ if st.session_state.session_id:
                     # End the session properly
                     if not is_demo:
                         try:
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            loop.run_until_complete(
+                            run_async(
                                 anam_service.end_session(session.get("sessionId", ""))
                             )
                         except Exception:
@@ -601,9 +593,7 @@ if st.session_state.session_id:
             if st.button("🎬 Start Avatar Session", key="start_avatar_tab", type="primary"):
                 with st.spinner("Initializing avatar..."):
                     try:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        session_data = loop.run_until_complete(
+                        session_data = run_async(
                             anam_service.create_session_token(persona_name="AI Assistant")
                         )
 
@@ -628,35 +618,4 @@ else:
 
     # Show feature overview
     st.divider()
-    st.markdown("""
-    ## 🚀 Features
-    
-    ### Multi-Modal Interactions
-    - **💬 Text Chat:** Talk to specialized agents
-    - **🎙️ Voice Agent:** Ultra-low latency voice with Groq & OpenAI
-    
-    ### Supervisor Agent Architecture
-    - Intelligent routing to specialized domain agents
-    - Automatic intent detection
-    - Context-aware responses
-    
-    ### Specialized Agents
-    - 🔍 **Research:** Web research and information gathering
-    - 💰 **Finance:** Financial advice and market data
-    - ✈️ **Travel:** Flight and hotel booking assistance
-    - 🛍️ **Shopping:** Product recommendations
-    - 💼 **Jobs:** Job search and career guidance
-    - 👨🍳 **Recipes:** Recipe discovery with ratings
-    
-    ### Advanced Features
-    - **🧠 Long-term Memory:** Mem0 integration never forgets
-    - **📚 RAG:** ChromaDB + Groq for multi-PDF context
-    - **⚡ Parallel Processing:** Fast, concurrent agent execution
-    
-    ### Tech Stack
-    - **LangGraph:** Multi-agent orchestration
-    - **Cerebras GPT-OSS-120B:** Main reasoning model
-    - **Mem0:** Persistent memory
-    - **SerpApi:** Job, flight, and recipe search
-    - **ChromaDB:** Vector embeddings
-    """)
+    st.markdown(FEATURES_OVERVIEW)
@@ -1,17 +1,28 @@
-import json
+import asyncio
+import logging
 import time
-from typing import List, Optional, Dict, Any
+from typing import Any, AsyncIterator, Dict, List, Optional
 
+import orjson
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from services.llm_service import llm_service  # Cerebras only
 from services.supervisor_agent import supervisor_agent
-from services.specialized_agents import AGENT_REGISTRY
-from services.tools_service import mem0_service
+from services.specialized_agents import AGENT_NAMES, AgentKind, get_agent
+from services.tools_service import mem0_service, serpapi_service
+from services.voice_service import voice_service
+from services.session_store import session_store
+from services.http_pool import close_shared_http_client
+from services.background import drain_background_tasks, spawn_background
 from config.settings import settings  
+from config.logging_setup import setup_logging
+
+setup_logging(settings.log_level)
+logger = logging.getLogger(__name__)
 
 
 # -------------------------------
@@ -43,6 +54,12 @@ class MultiModalRequest(BaseModel):
     conversation_history: Optional[List[Message]] = None
 
 
+class SpeechRequest(BaseModel):
+    """Request for text-to-speech."""
+    text: str
+    voice: str = "alloy"
+
+
 # -------------------------------
 # FastAPI App
 # -------------------------------
@@ -62,6 +79,36 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Compress regular JSON responses. Streaming endpoints opt out via an explicit
+# Content-Encoding header so frames are never held back in the compressor.
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
+
+# -------------------------------
+# Background Tasks
+# -------------------------------
+
+@app.on_event("shutdown")
+async def finish_background_tasks():
+    """Let pending background writes finish before the process exits."""
+    await drain_background_tasks()
+
+
+# -------------------------------
+# Shared Client Lifecycle
+# -------------------------------
+
+@app.on_event("startup")
+async def open_service_clients():
+    """Open pooled HTTP clients once so requests reuse warm connections."""
+    await serpapi_service.open()
+
+
+@app.on_event("shutdown")
+async def close_service_clients():
+    await serpapi_service.close()
+    await close_shared_http_client()
+
 
 # -------------------------------
 # Health & Debug Endpoints
@@ -76,7 +123,7 @@ async def health_check():
 async def list_agents():
     """List all available specialized agents."""
     return {
-        "agents": list(AGENT_REGISTRY.keys()),
+        "agents": list(AGENT_NAMES),
         "domains": settings.agent_domains,
         "interaction_modes": {
             "text_chat": settings.enable_text_chat,
@@ -98,6 +145,7 @@ async def create_session(body: SessionCreateRequest):
     """
     try:
         session_id = f"session-{body.user_id}"
+        session_store.clear(session_id)
 
         # Initialize user in Mem0
         if settings.mem0_enabled:
@@ -119,6 +167,38 @@ async def create_session(body: SessionCreateRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.delete("/session/{session_id}")
+async def clear_session(session_id: str):
+    """Drop the server-side conversation history for a session."""
+    session_store.clear(session_id)
+    return {"session_id": session_id, "cleared": True}
+
+
+@app.get("/session/{session_id}/history")
+async def get_session_history(
+    session_id: str,
+    limit: Optional[int] = Query(None, ge=1, description="Most recent messages to return"),
+):
+    """Return the server-side conversation history for a session."""
+    return {
+        "session_id": session_id,
+        "messages": session_store.get_history(session_id, limit=limit),
+    }
+
+
+def _conversation_history(payload: MultiModalRequest) -> List[Dict[str, str]]:
+    """Use client-sent history when present, otherwise the server-side session history."""
+    if payload.conversation_history:
+        return [
+            {"role": m.role, "content": m.content}
+            for m in payload.conversation_history
+        ]
+    return session_store.get_history(
+        payload.session_id,
+        limit=settings.session_history_context_messages,
+    )
+
+
 # -------------------------------
 # Supervisor Agent Routing Endpoint
 # -------------------------------
@@ -147,10 +227,7 @@ async def route_message(payload: MultiModalRequest):
         routing_decision = await supervisor_agent.route(
             message=payload.message,
             user_id=payload.user_id,
-            conversation_history=[
-                {"role": m.role, "content": m.content}
-                for m in payload.conversation_history or []
-            ],
+            conversation_history=_conversation_history(payload),
             user_memories=user_memories,
         )
 
@@ -169,6 +246,69 @@ async def route_message(payload: MultiModalRequest):
 # Multi-Agent Stream Endpoint
 # -------------------------------
 
+def sse_event(data: Dict[str, Any]) -> bytes:
+    """Encode one Server-Sent Events frame."""
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+def ndjson_event(data: Dict[str, Any]) -> bytes:
+    """Encode one newline-delimited JSON record."""
+    return orjson.dumps(data) + b"\n"
+
+
+async def coalesce_chunks(
+    chunks: AsyncIterator[str],
+    min_chars: int = 32,
+    max_delay: float = 0.015,
+) -> AsyncIterator[str]:
+    """
+    Merge small streamed chunks into larger ones to cut per-frame overhead.
+
+    Buffered text is flushed once it reaches ``min_chars`` or when no new
+    chunk arrives within ``max_delay`` seconds, so slow streams are not held back.
+    """
+    iterator = chunks.__aiter__()
+
+    async def next_chunk() -> str:
+        return await iterator.__anext__()
+
+    buffer: List[str] = []
+    buffered = 0
+    pending: Optional[asyncio.Task] = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.create_task(next_chunk())
+            # asyncio.wait (unlike wait_for) leaves the pending read running on timeout
+            done, _ = await asyncio.wait({pending}, timeout=max_delay if buffer else None)
+            if not done:
+                yield "".join(buffer)
+                buffer.clear()
+                buffered = 0
+                continue
+
+            task, pending = pending, None
+            try:
+                chunk = task.result()
+            except StopAsyncIteration:
+                break
+            if not chunk:
+                continue
+
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= min_chars:
+                yield "".join(buffer)
+                buffer.clear()
+                buffered = 0
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
 @app.post("/multi-agent/stream")
 async def multi_agent_stream(payload: MultiModalRequest):
     """
@@ -184,91 +324,117 @@ async def multi_agent_stream(payload: MultiModalRequest):
     async def event_generator():
         """Generate streaming responses from appropriate agent."""
         try:
-            print(f"\n{'='*60}")
-            print(f"MULTI-AGENT REQUEST")
-            print(f"User: {payload.user_id} | Session: {payload.session_id}")
-            print(f"Message: {payload.message}")
-            print(f"Mode: {payload.mode}")
-            print(f"{'='*60}")
-
-            # Step 1: Get user memories
-            user_memories = None
-            if settings.mem0_enabled:
+            logger.info(
+                "Multi-agent request user=%s session=%s mode=%s",
+                payload.user_id, payload.session_id, payload.mode,
+            )
+            logger.debug("Message: %s", payload.message)
+
+            # Step 1: Fetch user memories and route via supervisor concurrently.
+            # The classifier only looks at the message, so routing does not
+            # have to wait for Mem0.
+            async def load_user_memories() -> Optional[Dict[str, Any]]:
+                if not settings.mem0_enabled:
+                    return None
                 memories = await mem0_service.retrieve_memories(
                     user_id=payload.user_id,
                     limit=5
                 )
-                user_memories = {
+                return {
                     "memories": memories,
                     "user_id": payload.user_id
                 }
 
-            # Step 2: Route via supervisor
-            print(f"\nROUTING via Supervisor Agent...")
-            routing_decision = await supervisor_agent.route(
-                message=payload.message,
-                user_id=payload.user_id,
-                conversation_history=[
-                    {"role": m.role, "content": m.content}
-                    for m in payload.conversation_history or []
-                ],
-                user_memories=user_memories,
+            logger.debug("Routing via supervisor agent")
+            user_memories, routing_decision = await asyncio.gather(
+                load_user_memories(),
+                supervisor_agent.route(
+                    message=payload.message,
+                    user_id=payload.user_id,
+                    conversation_history=_conversation_history(payload),
+                ),
             )
 
             recommended_agent = routing_decision["recommended_agent"]
-            print(f"ROUTED TO: {recommended_agent}")
+            logger.info("Routed to %s agent", recommended_agent)
 
             # Step 3: Get specialized agent
-            agent = AGENT_REGISTRY.get(recommended_agent)
-            if not agent:
+            agent_kind = AgentKind.from_name(recommended_agent)
+            if agent_kind is None:
                 raise ValueError(f"Unknown agent: {recommended_agent}")
+            agent = get_agent(agent_kind)
 
             # Step 4: Stream from specialized agent
-            print(f"PROCESSING with {recommended_agent} agent...\n")
-            
-            full_response = ""
-            async for chunk in agent.process(
+            # Send agent/mode once up front; token frames carry only content
+            yield ndjson_event({
+                "type": "meta",
+                "agent": recommended_agent,
+                "mode": payload.mode
+            })
+
+            response_parts: List[str] = []
+            response_length = 0
+            async for chunk in coalesce_chunks(agent.process(
                 message=payload.message,
                 user_id=payload.user_id,
                 user_memories=user_memories,
-            ):
-                full_response += chunk
-                payload_json = json.dumps({
-                    "content": chunk,
-                    "agent": recommended_agent,
-                    "mode": payload.mode
-                })
-                yield f"data: {payload_json}\n\n"
+            )):
+                response_parts.append(chunk)
+                response_length += len(chunk)
+                yield ndjson_event({"content": chunk})
 
             # Step 5: Save to memories
-            print(f"\nSaving to memories...")
+            # Record the turn in the server-side session history
+            session_store.append(payload.session_id, "user", payload.message)
+            session_store.append(payload.session_id, "assistant", "".join(response_parts))
             
-            # Save to Mem0
+            # Save to Mem0 without holding the stream open for the write
             if settings.mem0_enabled:
-                await mem0_service.add_memory(
+                spawn_background(mem0_service.add_memory(
                     user_id=payload.user_id,
                     message=f"Used {recommended_agent} agent: {payload.message[:100]}",
                     metadata={
                         "agent": recommended_agent,
                         "mode": payload.mode,
-                        "response_length": len(full_response),
+                        "response_length": response_length,
                     }
-                )
+                ))
 
-            print(f"Response saved. Length: {len(full_response)} chars")
-            print(f"{'='*60}\n")
+            logger.debug("Response complete: %d chars", response_length)
 
         except Exception as e:
-            err_payload = json.dumps({"error": str(e), "content": f"Error: {str(e)}"})
-            yield f"data: {err_payload}\n\n"
-            print(f"ERROR: {e}")
+            yield ndjson_event({"error": str(e), "content": f"Error: {str(e)}"})
+            logger.exception("Multi-agent stream failed: %s", e)
 
     return StreamingResponse(
         event_generator(),
-        media_type="text/event-stream",
+        media_type="application/x-ndjson",
         headers={
             "Cache-Control": "no-cache",
             "X-Accel-Buffering": "no",
+            "Content-Encoding": "identity",
+        },
+    )
+
+
+# -------------------------------
+# Voice
+# -------------------------------
+
+@app.post("/voice/tts")
+async def voice_tts(payload: SpeechRequest):
+    """Stream synthesized speech (mp3) as it is produced."""
+    if not payload.text.strip():
+        raise HTTPException(status_code=400, detail="No text provided")
+
+    return StreamingResponse(
+        voice_service.stream_speech(payload.text, voice=payload.voice),
+        media_type="audio/mpeg",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # Already compressed; keep GZip from buffering the stream
+            "Content-Encoding": "identity",
         },
     )
 
@@ -302,13 +468,9 @@ async def llm_stream(
         raise HTTPException(status_code=400, detail="No user message found")
 
     async def event_generator():
-        full_response: str = ""
-
         try:
-            print(f"\n{'='*60}")
-            print(f"LEGACY LLM STREAM for session: {session_id}")
-            print(f"Message: {user_message}")
-            print(f"{'='*60}")
+            logger.info("Legacy LLM stream for session %s", session_id)
+            logger.debug("Message: %s", user_message)
 
             system_prompt = """
 You are a helpful AI assistant. When provided with relevant information or context below, 
@@ -321,8 +483,6 @@ If the context contains the answer, state it clearly and add relevant details fr
                 {"role": m.role, "content": m.content} for m in messages
             ]
 
-            print(f"STREAMING LLM RESPONSE...")
-
             chunk_count = 0
             async for chunk in llm_service.stream_chat_completion(
                 messages=formatted_messages,
@@ -332,15 +492,10 @@ If the context contains the answer, state it clearly and add relevant details fr
                     continue
 
                 chunk_count += 1
-                full_response += chunk
-                payload = json.dumps({"content": chunk})
-                yield f"data: {payload}\n\n"
-
-            print(f"{'='*60}\n")
+                yield sse_event({"content": chunk})
 
         except Exception as e:
-            err_payload = json.dumps({"content": "Error: " + str(e)})
-            yield f"data: {err_payload}\n\n"
+            yield sse_event({"content": "Error: " + str(e)})
 
     return StreamingResponse(
         event_generator(),
@@ -348,6 +503,7 @@ If the context contains the answer, state it clearly and add relevant details fr
         headers={
             "Cache-Control": "no-cache",
             "X-Accel-Buffering": "no",
+            "Content-Encoding": "identity",
         },
     )
 
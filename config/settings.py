@@ -36,6 +36,17 @@ class Settings(BaseSettings):
     # Agent Configuration
     # ========================
     primary_llm_model: str = "llama-3.1-8b-instant"  # Groq Reasoning Model
+    routing_cache_size: int = 1024
+    routing_cache_ttl_seconds: float = 300.0  # Reuse routing decisions for repeat queries
+
+    # LLM response caches (kept out of the RAG directory; gitignored)
+    llm_cache_dir: str = "./data/llm_cache"
+    summary_cache_ttl_seconds: float = 7 * 24 * 3600  # Persisted TTS summaries
+
+    # Semantic LLM response cache (embeddings stored in ChromaDB)
+    semantic_cache_enabled: bool = False  # Opt in: near-duplicate prompts share answers across users
+    semantic_cache_threshold: float = 0.92  # Minimum cosine similarity for a hit
+    semantic_cache_max_entries: int = 5000
     
     # Specialized agent domains
     agent_domains: List[str] = [
@@ -47,6 +58,12 @@ class Settings(BaseSettings):
         "recipes"
     ]
 
+    # ========================
+    # Session History (server-side)
+    # ========================
+    session_history_max_messages: int = 40
+    session_history_context_messages: int = 20  # Messages passed to the supervisor
+
     # ========================
     # Interaction Modes
     # ========================
@@ -54,6 +71,11 @@ class Settings(BaseSettings):
     enable_voice_agent: bool = True
     enable_video_avatar: bool = True # Anam AI avatar (requires ANAM_API_KEY)
 
+    # ========================
+    # Logging
+    # ========================
+    log_level: str = "INFO"
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
@@ -0,0 +1,99 @@
+"""Static UI content for the Streamlit frontend.
+
+Kept outside ``app_v2.py`` because Streamlit re-executes the app script on
+every interaction, while imported modules are only evaluated once per process.
+"""
+from typing import Any, Dict
+
+
+_CSS = """
+    .main > div {
+        padding-top: 2rem;
+    }
+    .stButton button {
+        width: 100%;
+    }
+    .agent-badge {
+        display: inline-block;
+        padding: 0.5rem 1rem;
+        border-radius: 0.5rem;
+        font-size: 0.9rem;
+        font-weight: 600;
+    }
+    .agent-research { background: #e8f4f8; color: #0288d1; }
+    .agent-finance { background: #f3e5f5; color: #7b1fa2; }
+    .agent-travel { background: #e8f5e9; color: #388e3c; }
+    .agent-shopping { background: #fff3e0; color: #f57c00; }
+    .agent-jobs { background: #fce4ec; color: #c2185b; }
+    .agent-recipes { background: #f1f8e9; color: #558b2f; }
+"""
+
+# Streamlit drops elements a rerun does not re-emit, so the style block has to
+# be sent on every run; collapse whitespace once here to keep that payload small.
+APP_CSS = "<style>" + " ".join(_CSS.split()) + "</style>"
+
+AGENTS_INFO: Dict[str, Dict[str, Any]] = {
+    "research": {
+        "icon": "🔍",
+        "description": "Web research, articles, and information gathering",
+        "tools": ["News search", "ChromaDB RAG", "Document retrieval"]
+    },
+    "finance": {
+        "icon": "💰",
+        "description": "Financial information, stocks, and investment advice",
+        "tools": ["Financial news", "Market data", "Investment guidance"]
+    },
+    "travel": {
+        "icon": "✈️",
+        "description": "Flights, hotels, and trip planning",
+        "tools": ["Flight search", "Hotel booking", "Travel guides"]
+    },
+    "shopping": {
+        "icon": "🛍️",
+        "description": "Product recommendations and shopping assistance",
+        "tools": ["Product search", "Price comparison", "Recommendations"]
+    },
+    "jobs": {
+        "icon": "💼",
+        "description": "Job search and career advice",
+        "tools": ["Google Jobs search", "Resume tips", "Career guidance"]
+    },
+    "recipes": {
+        "icon": "👨🍳",
+        "description": "Recipe discovery with ratings and ingredients",
+        "tools": ["Recipe search", "Ingredient lookup", "Cooking tips"]
+    }
+}
+
+FEATURES_OVERVIEW = """
+## 🚀 Features
+
+### Multi-Modal Interactions
+- **💬 Text Chat:** Talk to specialized agents
+- **🎙️ Voice Agent:** Ultra-low latency voice with Groq & OpenAI
+
+### Supervisor Agent Architecture
+- Intelligent routing to specialized domain agents
+- Automatic intent detection
+- Context-aware responses
+
+### Specialized Agents
+- 🔍 **Research:** Web research and information gathering
+- 💰 **Finance:** Financial advice and market data
+- ✈️ **Travel:** Flight and hotel booking assistance
+- 🛍️ **Shopping:** Product recommendations
+- 💼 **Jobs:** Job search and career guidance
+- 👨🍳 **Recipes:** Recipe discovery with ratings
+
+### Advanced Features
+- **🧠 Long-term Memory:** Mem0 integration never forgets
+- **📚 RAG:** ChromaDB + Groq for multi-PDF context
+- **⚡ Parallel Processing:** Fast, concurrent agent execution
+
+### Tech Stack
+- **LangGraph:** Multi-agent orchestration
+- **Cerebras GPT-OSS-120B:** Main reasoning model
+- **Mem0:** Persistent memory
+- **SerpApi:** Job, flight, and recipe search
+- **ChromaDB:** Vector embeddings
+"""
@@ -0,0 +1,29 @@
+"""Fire-and-forget task helpers shared by the backend and services."""
+import asyncio
+import logging
+from typing import Set
+
+logger = logging.getLogger(__name__)
+
+# Strong references to fire-and-forget tasks so they are not garbage collected
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _on_background_task_done(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error("Background task failed: %s", task.exception(), exc_info=task.exception())
+
+
+def spawn_background(coro) -> asyncio.Task:
+    """Run a coroutine off the request's critical path."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+    return task
+
+
+async def drain_background_tasks() -> None:
+    """Wait for pending background tasks (called on shutdown)."""
+    if _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
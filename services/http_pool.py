@@ -0,0 +1,18 @@
+"""Shared pooled HTTP client for outbound LLM and voice API calls."""
+import httpx
+
+# One keep-alive pool reused by the OpenAI, Groq and LangChain clients so
+# calls to the same provider skip the TCP/TLS handshake.
+shared_http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_keepalive_connections=64,
+        max_connections=128,
+        keepalive_expiry=30,
+    ),
+    timeout=60.0,
+)
+
+
+async def close_shared_http_client() -> None:
+    """Close the shared client (call on application shutdown)."""
+    await shared_http_client.aclose()
@@ -1,7 +1,22 @@
 """LLM service for Groq-powered LLM interactions."""
+import asyncio
+import hashlib
 import json
+import logging
+import time
+from collections import OrderedDict
 from typing import AsyncGenerator, List, Dict, Any, Optional, cast
+from openai import APIConnectionError, InternalServerError
 from config import settings
+from services.http_pool import shared_http_client
+from services.semantic_cache import semantic_cache
+from services.background import spawn_background
+from services.summary_store import summary_store
+
+logger = logging.getLogger(__name__)
+
+# Exact-match summaries kept in memory (least recently used dropped first)
+SUMMARY_CACHE_SIZE = 512
 
 
 class LLMService:
@@ -14,8 +29,10 @@ class LLMService:
         from openai import AsyncOpenAI
         self.client = AsyncOpenAI(
             base_url="https://api.groq.com/openai/v1",
-            api_key=settings.groq_api
+            api_key=settings.groq_api,
+            http_client=shared_http_client,
         )
+        self._summary_cache: "OrderedDict[str, str]" = OrderedDict()
 
     async def stream_chat_completion(
         self,
@@ -23,10 +40,28 @@ class LLMService:
         system_prompt: str,
     ) -> AsyncGenerator[str, None]:
         """Stream chat completion from Groq LLM."""
+        # Semantic cache: match on the latest message, scoped to an exact
+        # match of the model, system prompt and earlier turns
+        last_message = messages[-1]["content"] if messages else ""
+        cache_context = semantic_cache.context_key(
+            settings.primary_llm_model,
+            system_prompt,
+            *(f"{m['role']}:{m['content']}" for m in messages[:-1]),
+        )
+        if settings.semantic_cache_enabled:
+            cached = await semantic_cache.get(last_message, cache_context)
+            if cached is not None:
+                for i in range(0, len(cached), 64):
+                    yield cached[i:i + 64]
+                    await asyncio.sleep(0)
+                return
+
         # Prepend system message
         openai_messages = [{"role": "system", "content": system_prompt}]
         openai_messages.extend(messages)
 
+        response_parts: List[str] = []
+        yielded_any = False
         try:
             # Stream response
             stream = await self.client.chat.completions.create(
@@ -37,12 +72,30 @@ class LLMService:
                 max_tokens=2048,
             )
 
+            # Coalesce tiny deltas: flush every 8 deltas or 30 ms. The first
+            # delta flushes immediately (last_flush starts at 0).
+            buf: List[str] = []
+            last_flush = 0.0
             async for chunk in stream:
                 if chunk.choices and chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
-        except Exception as e:
-            # If streaming fails, try non-streaming
-            print(f"\nStreaming failed, using non-streaming mode: {e}")
+                    response_parts.append(chunk.choices[0].delta.content)
+                    buf.append(chunk.choices[0].delta.content)
+                    now = time.monotonic()
+                    if len(buf) >= 8 or now - last_flush >= 0.03:
+                        yielded_any = True
+                        yield "".join(buf)
+                        buf.clear()
+                        last_flush = now
+            if buf:
+                yielded_any = True
+                yield "".join(buf)
+        except (APIConnectionError, InternalServerError) as e:
+            # Retry without streaming only if the client has seen nothing yet;
+            # after partial output a retry would duplicate text and billing
+            if yielded_any:
+                raise
+            logger.warning("Streaming failed, using non-streaming mode: %s", e)
+            response_parts.clear()
             response = await self.client.chat.completions.create(
                 model=settings.primary_llm_model,
                 messages=cast(Any, openai_messages),
@@ -51,8 +104,15 @@ class LLMService:
                 max_tokens=2048,
             )
             if response.choices and response.choices[0].message.content:
+                response_parts.append(response.choices[0].message.content)
                 yield response.choices[0].message.content
 
+        if response_parts and settings.semantic_cache_enabled:
+            # Embedding + upsert stays off the caller's critical path
+            spawn_background(
+                semantic_cache.set(last_message, cache_context, "".join(response_parts))
+            )
+
     async def summarize_text(self, text: str, max_words: int = 150) -> str:
         """
         Generate a concise, spoken-style summary using Groq.
@@ -67,16 +127,37 @@ class LLMService:
             A summarized version of the text suitable for audio playback
         """
         if not text or not text.strip():
-            print("[Summarize] No text provided")
+            logger.debug("Summarize: no text provided")
             return ""
             
         if not settings.groq_api:
-            print("[Summarize] GROQ_API not configured")
+            logger.warning("Summarize: GROQ_API not configured")
             return text[:300] + "..."
         
         # Clean the input text
         clean_text = text.strip()[:12000]  # Limit input size
-        
+
+        # Summaries are keyed on the exact text: a near-match (e.g. a reply with
+        # the same opening) must not get another reply's summary
+        summary_key = (
+            hashlib.blake2b(clean_text.encode("utf-8"), digest_size=16).hexdigest()
+            + f":{max_words}"
+        )
+        cached = self._summary_cache.get(summary_key)
+        if cached is not None:
+            self._summary_cache.move_to_end(summary_key)
+            return cached
+
+        # Then the persistent store, so repeats survive restarts
+        try:
+            stored = await asyncio.to_thread(summary_store.get, summary_key)
+        except Exception as e:
+            logger.warning("Summary store lookup failed: %s", e)
+            stored = None
+        if stored is not None:
+            self._remember_summary(summary_key, stored)
+            return stored
+
         prompt = f"""Create a concise, conversational summary of the following text. 
 The summary should be:
 - About {max_words} words maximum
@@ -93,7 +174,7 @@ Text to summarize:
 Concise spoken summary:"""
 
         try:
-            print(f"[Summarize] Processing text of {len(clean_text)} chars...")
+            logger.debug("Summarize: processing text of %d chars", len(clean_text))
             
             response = await self.client.chat.completions.create(
                 model=settings.primary_llm_model,
@@ -115,17 +196,24 @@ Concise spoken summary:"""
             content = response.choices[0].message.content
             if content and content.strip():
                 summary = content.strip()
-                print(f"[Summarize] Generated summary of {len(summary)} chars")
+                logger.debug("Summarize: generated summary of %d chars", len(summary))
+                self._remember_summary(summary_key, summary)
+                spawn_background(asyncio.to_thread(summary_store.set, summary_key, summary))
                 return summary
             
-            print("[Summarize] Empty response from LLM")
+            logger.warning("Summarize: empty response from LLM")
             return text[:300] + "..."
             
         except Exception as e:
-            print(f"[Summarize] Error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Summarize failed: %s", e)
             return text[:300] + "..."
 
+    def _remember_summary(self, key: str, summary: str) -> None:
+        """Store a summary in the exact-match cache, evicting the oldest entry."""
+        self._summary_cache[key] = summary
+        self._summary_cache.move_to_end(key)
+        if len(self._summary_cache) > SUMMARY_CACHE_SIZE:
+            self._summary_cache.popitem(last=False)
+
 # Global service instance
 llm_service = LLMService()
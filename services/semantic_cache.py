@@ -0,0 +1,156 @@
+"""Semantic response cache for LLM calls, backed by ChromaDB."""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# all-MiniLM-L6-v2 truncates input at 256 word pieces; longer prompts are only
+# embedded by their opening, so they are matched on an exact hash instead
+MAX_SEMANTIC_CHARS = 800
+
+
+class SemanticCache:
+    """
+    Cache LLM responses by embedding similarity of the prompt.
+
+    Entries are embedded with ChromaDB's default embedding function
+    (all-MiniLM-L6-v2) and persisted under settings.llm_cache_dir (separate
+    from the RAG store and gitignored, since entries hold user conversations),
+    so hits survive restarts. Each entry is scoped by a context key (e.g. a hash of the
+    system prompt and earlier turns): only prompts with the same context are
+    compared, so a short follow-up like "yes" never matches another conversation.
+    Prompts longer than the embedder's window only hit on an exact match.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "llm_response_cache",
+        threshold: float = 0.92,
+        max_entries: int = 5000,
+    ):
+        """
+        Configure the cache.
+
+        The collection is opened on first use, so only the backend (which runs
+        stream_chat_completion) opens the cache directory; Chroma does not
+        support several writer processes on one path.
+        """
+        self.collection_name = collection_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._collection = None
+        self._disabled = False
+        self._lock = threading.Lock()
+
+    def _get_collection(self):
+        """Open the cache collection (cache is disabled if ChromaDB is unavailable)."""
+        with self._lock:
+            if self._collection is None and not self._disabled:
+                try:
+                    import chromadb
+                    client = chromadb.PersistentClient(
+                        path=os.path.join(settings.llm_cache_dir, "semantic")
+                    )
+                    self._collection = client.get_or_create_collection(
+                        name=self.collection_name,
+                        metadata={"hnsw:space": "cosine"},
+                    )
+                except Exception as e:
+                    logger.warning("Semantic cache disabled: %s", e)
+                    self._disabled = True
+            return self._collection
+
+    @staticmethod
+    def context_key(*parts: str) -> str:
+        """Hash the parts of a prompt that must match exactly."""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    async def get(self, text: str, context: str) -> Optional[str]:
+        """Return a cached response for a semantically similar prompt, if any."""
+        if self._disabled or not text.strip():
+            return None
+        try:
+            return await asyncio.to_thread(self._query, text, context)
+        except Exception as e:
+            logger.warning("Semantic cache lookup failed: %s", e)
+            return None
+
+    async def set(self, text: str, context: str, response: str) -> None:
+        """Store a response for a prompt."""
+        if self._disabled or not text.strip() or not response:
+            return
+        try:
+            await asyncio.to_thread(self._store, text, context, response)
+        except Exception as e:
+            logger.warning("Semantic cache store failed: %s", e)
+
+    def _query(self, text: str, context: str) -> Optional[str]:
+        collection = self._get_collection()
+        if collection is None:
+            return None
+        if len(text) > MAX_SEMANTIC_CHARS:
+            # Entry ids hash the context and the full text
+            exact = collection.get(ids=[self.context_key(context, text)], include=["metadatas"])
+            if not exact.get("ids"):
+                return None
+            return (exact["metadatas"][0] or {}).get("response")
+        results = collection.query(
+            query_texts=[text],
+            n_results=1,
+            where={"context": context},
+            include=["metadatas", "distances"],
+        )
+        if not results.get("ids") or not results["ids"][0]:
+            return None
+        # Cosine distance = 1 - cosine similarity
+        similarity = 1.0 - results["distances"][0][0]
+        if similarity < self.threshold:
+            return None
+        return results["metadatas"][0][0].get("response")
+
+    def _store(self, text: str, context: str, response: str) -> None:
+        collection = self._get_collection()
+        if collection is None:
+            return
+        collection.upsert(
+            ids=[self.context_key(context, text)],
+            documents=[text],
+            metadatas=[{
+                "context": context,
+                "response": response,
+                "created_at": time.time(),
+            }],
+        )
+        self._evict(collection)
+
+    def _evict(self, collection) -> None:
+        """Drop the oldest entries once the cache grows past max_entries."""
+        count = collection.count()
+        if count <= self.max_entries:
+            return
+        # Evict in batches (10% headroom) so this does not run on every insert
+        excess = count - int(self.max_entries * 0.9)
+        entries = collection.get(include=["metadatas"])
+        oldest = sorted(
+            zip(entries["ids"], entries["metadatas"]),
+            key=lambda item: (item[1] or {}).get("created_at", 0),
+        )[:excess]
+        collection.delete(ids=[entry_id for entry_id, _ in oldest])
+
+
+# Global cache instance
+semantic_cache = SemanticCache(
+    threshold=settings.semantic_cache_threshold,
+    max_entries=settings.semantic_cache_max_entries,
+)
@@ -0,0 +1,53 @@
+"""In-memory conversation history store keyed by session ID."""
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional
+
+from config.settings import settings
+
+
+class SessionStore:
+    """Server-side rolling conversation history for chat sessions."""
+
+    def __init__(self, max_messages: int = 40, max_sessions: int = 1000):
+        """
+        Initialize the session store.
+
+        Args:
+            max_messages: Messages kept per session (oldest dropped first)
+            max_sessions: Sessions kept in memory (least recently used dropped first)
+        """
+        self.max_messages = max_messages
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Deque[Dict[str, str]]]" = OrderedDict()
+
+    def _get(self, session_id: str) -> Deque[Dict[str, str]]:
+        """Get (or create) the history deque for a session and mark it recently used."""
+        history = self._sessions.get(session_id)
+        if history is None:
+            history = deque(maxlen=self.max_messages)
+            self._sessions[session_id] = history
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return history
+
+    def append(self, session_id: str, role: str, content: str) -> None:
+        """Append a message to a session's history."""
+        self._get(session_id).append({"role": role, "content": content})
+
+    def get_history(self, session_id: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """Return the most recent messages for a session, oldest first."""
+        history = self._sessions.get(session_id)
+        if not history:
+            return []
+        messages = list(history)
+        return messages[-limit:] if limit else messages
+
+    def clear(self, session_id: str) -> None:
+        """Drop all history for a session."""
+        self._sessions.pop(session_id, None)
+
+
+# Global session store instance
+session_store = SessionStore(max_messages=settings.session_history_max_messages)
@@ -1,30 +1,113 @@
 """Specialized domain agents: Research, Finance, Travel, Shopping, Jobs, Recipes."""
-from typing import AsyncGenerator, List, Dict, Any, Optional
+from typing import AsyncGenerator, List, Dict, Any, Optional, Tuple, Type
 from abc import ABC, abstractmethod
-import json
+from collections import OrderedDict
+from enum import IntEnum
+import asyncio
+import functools
+import inspect
 
-from langchain_core.messages import HumanMessage
+import orjson
+
+from langchain_core.messages import HumanMessage, SystemMessage
 from config.settings import settings
 from services.tools_service import serpapi_service, mem0_service, chromadb_service
+from services.http_pool import shared_http_client
+from services.background import spawn_background
+
+
+@functools.lru_cache(maxsize=1)
+def _shared_llm():
+    """Single Groq chat client shared by all specialized agents."""
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=settings.primary_llm_model,
+        api_key=settings.groq_api,
+        base_url="https://api.groq.com/openai/v1",
+        temperature=0.7,
+        http_async_client=shared_http_client,
+    )
+
+
+def _to_json(obj: Any) -> str:
+    """Compact JSON with sorted keys, so identical data gives identical prompt bytes."""
+    return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS, default=str).decode()
+
+
+# SerpApi result fields worth sending to the model; the rest (thumbnails, ids,
+# positions, rich snippets) only add input tokens
+_RESULT_FIELDS = ("title", "snippet", "link", "source", "date")
+_PRODUCT_FIELDS = ("price", "rating", "reviews")
+_JOB_FIELDS = ("company_name", "location", "via", "description")
+_RECIPE_FIELDS = ("type", "rating", "reviews", "address", "description", "website")
+_RESULT_TEXT_LIMIT = 300
+
+
+def _compact_result(result: Dict[str, Any], extra_fields: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    """Project a search result down to the fields used in prompts."""
+    compact: Dict[str, Any] = {}
+    for field in _RESULT_FIELDS + extra_fields:
+        value = result.get(field)
+        if field == "source" and isinstance(value, dict):
+            value = value.get("name")
+        if value in (None, ""):
+            continue
+        if isinstance(value, str) and len(value) > _RESULT_TEXT_LIMIT:
+            value = value[:_RESULT_TEXT_LIMIT] + "..."
+        compact[field] = value
+    return compact
+
+
+# Encoded user memories keyed by (user_id, memory ids/versions)
+_memories_json_cache: "OrderedDict[Tuple[Any, ...], str]" = OrderedDict()
+_MEMORIES_JSON_CACHE_SIZE = 256
+
+
+def _memories_json(user_memories: Optional[Dict[str, Any]]) -> str:
+    """
+    Serialize user memories for a prompt.
+
+    Unchanged memories always produce identical bytes (needed for provider
+    prompt-cache hits). The encoding is reused across turns while the user's
+    Mem0 memories (by id and updated_at) are unchanged.
+    """
+    if not user_memories:
+        return "{}"
+
+    key = None
+    memories = user_memories.get("memories")
+    if isinstance(memories, list) and all(isinstance(m, dict) and "id" in m for m in memories):
+        key = (
+            user_memories.get("user_id"),
+            tuple((m["id"], m.get("updated_at")) for m in memories),
+        )
+        cached = _memories_json_cache.get(key)
+        if cached is not None:
+            _memories_json_cache.move_to_end(key)
+            return cached
+
+    encoded = _to_json(user_memories)
+    if key is not None:
+        _memories_json_cache[key] = encoded
+        if len(_memories_json_cache) > _MEMORIES_JSON_CACHE_SIZE:
+            _memories_json_cache.popitem(last=False)
+    return encoded
 
 
 class BaseSpecializedAgent(ABC):
     """Base class for all specialized agents."""
 
+    SYSTEM_PROMPT = ""
+
     def __init__(self, domain: str):
         """Initialize specialized agent."""
         self.domain = domain
         self.llm = self._init_llm()
+        self.system_message = SystemMessage(content=self.SYSTEM_PROMPT)
         
     def _init_llm(self):
-        """Initialize LLM for the agent using Groq API."""
-        from langchain_openai import ChatOpenAI
-        return ChatOpenAI(
-            model=settings.primary_llm_model,
-            api_key=settings.groq_api,
-            base_url="https://api.groq.com/openai/v1",
-            temperature=0.7,
-        )
+        """Get the LLM for the agent (shared Groq client)."""
+        return _shared_llm()
 
     @abstractmethod
     async def process(
@@ -44,10 +127,39 @@ class BaseSpecializedAgent(ABC):
             "memories": memories,
         }
 
+    async def _resolve_user_memories(
+        self,
+        user_id: str,
+        user_memories: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Use the memories passed by the caller, fetching from Mem0 only if none were."""
+        if user_memories is not None:
+            return user_memories
+        if not settings.mem0_enabled:
+            return {}
+        return await self._get_user_context(user_id)
+
+
+# Static system prompts: identical bytes every turn, so provider prompt caches can hit
+RESEARCH_SYSTEM_PROMPT = inspect.cleandoc("""
+    You are an **Academic Research Scientist**.
+    Your goal is to provide deep, technical, and scientifically accurate information.
+
+    Detailed Instructions:
+    1. **Focus on Facts**: Prioritize peer-reviewed papers, official reports, and technical documentation.
+    2. **Future Trends**: When asked about future years (e.g., 2025), interpret this as checking for pre-prints (arXiv), upcoming conference schedules (NeurIPS, CVPR), or roadmap announcements.
+    3. **No Fluff**: Avoid generic advice. Give specific titles, dates, or theories where possible.
+    4. **Scope**: Do NOT provide commercial product reviews, travel tips, or job listings unless explicitly crucial to the research context.
+
+    Provide a structured, academic-grade response capable of citing sources.
+""")
+
 
 class ResearchAgent(BaseSpecializedAgent):
     """Research agent for web research, articles, and information gathering."""
 
+    SYSTEM_PROMPT = RESEARCH_SYSTEM_PROMPT
+
     def __init__(self):
         super().__init__("research")
 
@@ -60,58 +172,57 @@ class ResearchAgent(BaseSpecializedAgent):
         """Process research queries."""
         yield "🔍 Searching for research information...\n"
         
-        # Get user context and memories
-        context = await self._get_user_context(user_id)
-        
-        # Search news for current information
-        news_results = await serpapi_service.search_news(message, num_results=3)
-        
-        # Query ChromaDB for document context
-        doc_results = await chromadb_service.query_documents(message)
+        # Get user context, news and ChromaDB documents concurrently
+        user_memories, news_results, doc_results = await asyncio.gather(
+            self._resolve_user_memories(user_id, user_memories),
+            serpapi_service.search_news(message, num_results=3),
+            chromadb_service.query_documents(message),
+        )
         
         # Build prompt with context
-        context_str = "Recent News Results:\n"
-        for result in news_results:
-            context_str += f"- {result.get('title', 'N/A')}: {result.get('snippet', '')}\n"
-        
-        context_str += "\nRelevant Documents:\n"
-        for doc in doc_results[:3]:
-            context_str += f"- {doc.get('document', '')[:200]}...\n"
-        
-        prompt = f"""
-        You are an **Academic Research Scientist**. 
-        Your goal is to provide deep, technical, and scientifically accurate information.
-        
-        Detailed Instructions:
-        1. **Focus on Facts**: Prioritize peer-reviewed papers, official reports, and technical documentation.
-        2. **Future Trends**: When asked about future years (e.g., 2025), interpret this as checking for pre-prints (arXiv), upcoming conference schedules (NeurIPS, CVPR), or roadmap announcements.
-        3. **No Fluff**: Avoid generic advice. Give specific titles, dates, or theories where possible.
-        4. **Scope**: Do NOT provide commercial product reviews, travel tips, or job listings unless explicitly crucial to the research context.
-
-        User Query: {message}
-        
-        Context Information:
-        {context_str}
-        
-        User Background: {json.dumps(user_memories or {})}
-        
-        Provide a structured, academic-grade response capable of citing sources.
-        """
+        parts = ["Recent News Results:"]
+        parts.extend(
+            f"- {result.get('title', 'N/A')}: {result.get('snippet', '')}"
+            for result in news_results
+        )
+        parts.append("")
+        parts.append("Relevant Documents:")
+        parts.extend(f"- {doc.get('document', '')[:200]}..." for doc in doc_results[:3])
+        context_str = "\n".join(parts)
+        
+        prompt = (
+            f"Query: {message}\n"
+            f"Context:\n{context_str}\n"
+            f"Background: {_memories_json(user_memories)}"
+        )
         
-        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-        yield response.content
+        async for chunk in self.llm.astream([
+            self.system_message,
+            HumanMessage(content=prompt),
+        ]):
+            if chunk.content:
+                yield chunk.content
         
         # Save to memory if useful
-        await mem0_service.add_memory(
+        spawn_background(mem0_service.add_memory(
             user_id=user_id,
             message=f"Researched: {message[:100]}",
             metadata={"domain": "research", "query": message}
-        )
+        ))
+
+
+FINANCE_SYSTEM_PROMPT = inspect.cleandoc("""
+    You are a financial advisor. Provide financial insights based on the query.
+
+    Provide balanced, informative financial guidance. Include disclaimers as appropriate.
+""")
 
 
 class FinanceAgent(BaseSpecializedAgent):
     """Finance agent for financial information, stock data, and investment advice."""
 
+    SYSTEM_PROMPT = FINANCE_SYSTEM_PROMPT
+
     def __init__(self):
         super().__init__("finance")
 
@@ -124,40 +235,51 @@ class FinanceAgent(BaseSpecializedAgent):
         """Process finance queries."""
         yield "💰 Analyzing financial information...\n"
         
-        context = await self._get_user_context(user_id)
-        
-        # Search for financial news
-        financial_info = await serpapi_service.search_news(
-            f"{message} financial news",
-            num_results=5
+        # Get user context and search financial news concurrently
+        user_memories, financial_info = await asyncio.gather(
+            self._resolve_user_memories(user_id, user_memories),
+            serpapi_service.search_news(
+                f"{message} financial news",
+                num_results=5
+            ),
         )
         
         prompt = f"""
-        You are a financial advisor. Provide financial insights based on the query.
-        
         User Query: {message}
         
         Financial Context:
-        {json.dumps(financial_info)}
+        {_to_json([_compact_result(r) for r in financial_info])}
         
-        User Profile: {json.dumps(user_memories or {})}
-        
-        Provide balanced, informative financial guidance. Include disclaimers as appropriate.
+        User Profile: {_memories_json(user_memories)}
         """
         
-        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-        yield response.content
+        async for chunk in self.llm.astream([
+            self.system_message,
+            HumanMessage(content=prompt),
+        ]):
+            if chunk.content:
+                yield chunk.content
         
-        await mem0_service.add_memory(
+        spawn_background(mem0_service.add_memory(
             user_id=user_id,
             message=f"Financial Query: {message[:100]}",
             metadata={"domain": "finance", "query": message}
-        )
+        ))
+
+
+TRAVEL_SYSTEM_PROMPT = inspect.cleandoc("""
+    You are a travel expert. Help plan the user's trip.
+
+    Provide detailed travel suggestions including flight/hotel tips,
+    best times to visit, budget estimates, and local recommendations.
+""")
 
 
 class TravelAgent(BaseSpecializedAgent):
     """Travel agent for flights, hotels, and trip planning."""
 
+    SYSTEM_PROMPT = TRAVEL_SYSTEM_PROMPT
+
     def __init__(self):
         super().__init__("travel")
 
@@ -170,35 +292,43 @@ class TravelAgent(BaseSpecializedAgent):
         """Process travel queries."""
         yield "✈️ Searching for travel options...\n"
         
-        context = await self._get_user_context(user_id)
+        user_memories = await self._resolve_user_memories(user_id, user_memories)
         
         # For now, provide general travel guidance
         # In real implementation, would parse message for departure, arrival, dates
         
         prompt = f"""
-        You are a travel expert. Help plan the user's trip.
-        
         User Query: {message}
         
-        User Travel Preferences: {json.dumps(user_memories or {})}
-        
-        Provide detailed travel suggestions including flight/hotel tips,
-        best times to visit, budget estimates, and local recommendations.
+        User Travel Preferences: {_memories_json(user_memories)}
         """
         
-        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-        yield response.content
+        async for chunk in self.llm.astream([
+            self.system_message,
+            HumanMessage(content=prompt),
+        ]):
+            if chunk.content:
+                yield chunk.content
         
-        await mem0_service.add_memory(
+        spawn_background(mem0_service.add_memory(
             user_id=user_id,
             message=f"Travel Interest: {message[:100]}",
             metadata={"domain": "travel", "query": message}
-        )
+        ))
+
+
+SHOPPING_SYSTEM_PROMPT = inspect.cleandoc("""
+    You are a shopping assistant. Recommend products based on the user's needs.
+
+    Provide thoughtful recommendations with pros/cons and budget considerations.
+""")
 
 
 class ShoppingAgent(BaseSpecializedAgent):
     """Shopping agent for product recommendations and shopping assistance."""
 
+    SYSTEM_PROMPT = SHOPPING_SYSTEM_PROMPT
+
     def __init__(self):
         super().__init__("shopping")
 
@@ -211,40 +341,57 @@ class ShoppingAgent(BaseSpecializedAgent):
         """Process shopping queries."""
         yield "🛍️ Finding product recommendations...\n"
         
-        context = await self._get_user_context(user_id)
-        
-        # Search for products
-        search_results = await serpapi_service.search_news(
-            f"{message} products reviews",
-            num_results=5
+        # Get user context and search for products concurrently
+        user_memories, search_results = await asyncio.gather(
+            self._resolve_user_memories(user_id, user_memories),
+            serpapi_service.search_news(
+                f"{message} products reviews",
+                num_results=5
+            ),
         )
         
         prompt = f"""
-        You are a shopping assistant. Recommend products based on the user's needs.
-        
         User Query: {message}
         
         Available Products/Options:
-        {json.dumps(search_results)}
+        {_to_json([_compact_result(r, _PRODUCT_FIELDS) for r in search_results])}
         
-        User Preferences: {json.dumps(user_memories or {})}
-        
-        Provide thoughtful recommendations with pros/cons and budget considerations.
+        User Preferences: {_memories_json(user_memories)}
         """
         
-        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-        yield response.content
+        async for chunk in self.llm.astream([
+            self.system_message,
+            HumanMessage(content=prompt),
+        ]):
+            if chunk.content:
+                yield chunk.content
         
-        await mem0_service.add_memory(
+        spawn_background(mem0_service.add_memory(
             user_id=user_id,
             message=f"Shopping Interest: {message[:100]}",
             metadata={"domain": "shopping", "query": message}
-        )
+        ))
+
+
+JOBS_SYSTEM_PROMPT = inspect.cleandoc("""
+    You are a **Career & Talent Acquisition Specialist**.
+    Your goal is to help users find jobs, improve resumes, and navigate their careers.
+
+    Detailed Instructions:
+    1. **Scope Enforcer**: If the user's query is NOT about jobs, careers, hiring, or professional development, do not attempt to answer it. State clearly that you are the Jobs Agent and this query seems better suited for another specialist (like Research or Finance).
+    2. **Job Search**: When asked for jobs, look for specific roles, locations, and requirements.
+    3. **Career Advice**: Provide actionable tips for interviews, networking, and salary negotiation.
+    4. **Anti-Hallucination**: Do not invent job postings. Use the provided search results.
+
+    Provide professional career guidance or job listings.
+""")
 
 
 class JobsAgent(BaseSpecializedAgent):
     """Jobs agent for job search and career advice."""
 
+    SYSTEM_PROMPT = JOBS_SYSTEM_PROMPT
+
     def __init__(self):
         super().__init__("jobs")
 
@@ -257,46 +404,52 @@ class JobsAgent(BaseSpecializedAgent):
         """Process job search queries."""
         yield "💼 Searching for job opportunities...\n"
         
-        context = await self._get_user_context(user_id)
-        
         # Parse job search query (simplified)
         # In real implementation, would extract job title, location, etc.
         
-        jobs = await serpapi_service.search_jobs(message, num_results=5)
-        
-        prompt = f"""
-        You are a **Career & Talent Acquisition Specialist**.
-        Your goal is to help users find jobs, improve resumes, and navigate their careers.
-        
-        Detailed Instructions:
-        1. **Scope Enforcer**: If the user's query is NOT about jobs, careers, hiring, or professional development, do not attempt to answer it. State clearly that you are the Jobs Agent and this query seems better suited for another specialist (like Research or Finance).
-        2. **Job Search**: When asked for jobs, look for specific roles, locations, and requirements.
-        3. **Career Advice**: Provide actionable tips for interviews, networking, and salary negotiation.
-        4. **Anti-Hallucination**: Do not invent job postings. Use the provided search results.
-
-        User Query: {message}
-        
-        Available Jobs:
-        {json.dumps(jobs)}
-        
-        User Profile: {json.dumps(user_memories or {})}
+        # Get user context and search jobs concurrently
+        user_memories, jobs = await asyncio.gather(
+            self._resolve_user_memories(user_id, user_memories),
+            serpapi_service.search_jobs(message, num_results=5),
+        )
         
-        Provide professional career guidance or job listings.
-        """
+        prompt = (
+            f"Query: {message}\n"
+            f"Available Jobs:\n{_to_json([_compact_result(r, _JOB_FIELDS) for r in jobs])}\n"
+            f"Profile: {_memories_json(user_memories)}"
+        )
         
-        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-        yield response.content
+        async for chunk in self.llm.astream([
+            self.system_message,
+            HumanMessage(content=prompt),
+        ]):
+            if chunk.content:
+                yield chunk.content
         
-        await mem0_service.add_memory(
+        spawn_background(mem0_service.add_memory(
             user_id=user_id,
             message=f"Job Search: {message[:100]}",
             metadata={"domain": "jobs", "query": message}
-        )
+        ))
+
+
+RECIPES_SYSTEM_PROMPT = inspect.cleandoc("""
+    You are a culinary expert and recipe guide.
+
+    Provide detailed recipe recommendations with:
+    - Ingredients and quantities
+    - Step-by-step instructions
+    - Cooking time and difficulty level
+    - Nutritional information if available
+    - Dietary notes and substitutions
+""")
 
 
 class RecipesAgent(BaseSpecializedAgent):
     """Recipes agent for recipe discovery and cooking guidance."""
 
+    SYSTEM_PROMPT = RECIPES_SYSTEM_PROMPT
+
     def __init__(self):
         super().__init__("recipes")
 
@@ -309,53 +462,69 @@ class RecipesAgent(BaseSpecializedAgent):
         """Process recipe queries."""
         yield "👨🍳 Finding recipes for you...\n"
         
-        context = await self._get_user_context(user_id)
-        
-        # Search for recipes
-        recipes = await serpapi_service.search_recipes(message, num_results=5)
+        # Get user context and search for recipes concurrently
+        user_memories, recipes = await asyncio.gather(
+            self._resolve_user_memories(user_id, user_memories),
+            serpapi_service.search_recipes(message, num_results=5),
+        )
         
         prompt = f"""
-        You are a culinary expert and recipe guide.
-        
         User Query: {message}
         
         Recipe Options:
-        {json.dumps(recipes)}
-        
-        User Dietary Preferences: {json.dumps(user_memories or {})}
+        {_to_json([_compact_result(r, _RECIPE_FIELDS) for r in recipes])}
         
-        Provide detailed recipe recommendations with:
-        - Ingredients and quantities
-        - Step-by-step instructions
-        - Cooking time and difficulty level
-        - Nutritional information if available
-        - Dietary notes and substitutions
+        User Dietary Preferences: {_memories_json(user_memories)}
         """
         
-        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-        yield response.content
+        async for chunk in self.llm.astream([
+            self.system_message,
+            HumanMessage(content=prompt),
+        ]):
+            if chunk.content:
+                yield chunk.content
         
-        await mem0_service.add_memory(
+        spawn_background(mem0_service.add_memory(
             user_id=user_id,
             message=f"Recipe Interest: {message[:100]}",
             metadata={"domain": "recipes", "query": message}
-        )
-
-
-# Global agent instances
-research_agent = ResearchAgent()
-finance_agent = FinanceAgent()
-travel_agent = TravelAgent()
-shopping_agent = ShoppingAgent()
-jobs_agent = JobsAgent()
-recipes_agent = RecipesAgent()
-
-# Agent registry for routing
-AGENT_REGISTRY = {
-    "research": research_agent,
-    "finance": finance_agent,
-    "travel": travel_agent,
-    "shopping": shopping_agent,
-    "jobs": jobs_agent,
-    "recipes": recipes_agent,
-}
+        ))
+
+
+# Agent dispatch for routing (instances are created on first use)
+class AgentKind(IntEnum):
+    """Specialized agent domains; values index the agent tables below."""
+    RESEARCH = 0
+    FINANCE = 1
+    TRAVEL = 2
+    SHOPPING = 3
+    JOBS = 4
+    RECIPES = 5
+
+    @classmethod
+    def from_name(cls, name: str) -> Optional["AgentKind"]:
+        """Map a domain name (e.g. "research") to its kind, or None if unknown."""
+        return cls.__members__.get(name.upper()) if name else None
+
+
+# Agent classes in AgentKind order
+_AGENT_CLASSES: Tuple[Type[BaseSpecializedAgent], ...] = (
+    ResearchAgent,
+    FinanceAgent,
+    TravelAgent,
+    ShoppingAgent,
+    JobsAgent,
+    RecipesAgent,
+)
+
+AGENT_NAMES: Tuple[str, ...] = tuple(kind.name.lower() for kind in AgentKind)
+
+_agent_instances: List[Optional[BaseSpecializedAgent]] = [None] * len(AgentKind)
+
+
+def get_agent(kind: AgentKind) -> BaseSpecializedAgent:
+    """Return the agent for a domain, constructing it on first use."""
+    agent = _agent_instances[kind]
+    if agent is None:
+        agent = _agent_instances[kind] = _AGENT_CLASSES[kind]()
+    return agent
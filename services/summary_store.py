@@ -0,0 +1,71 @@
+"""Persistent exact-match store for generated summaries, backed by SQLite."""
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from config.settings import settings
+
+
+class SummaryStore:
+    """Summaries keyed by an exact hash of their input, kept across restarts."""
+
+    def __init__(self, path: str, ttl_seconds: float = 7 * 24 * 3600):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite file (created on first use)
+            ttl_seconds: Age after which a summary is ignored and purged
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the table on first use."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                "key TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS summaries_created_at ON summaries (created_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored summary for a key, unless missing or expired."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT summary, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return row[0]
+
+    def set(self, key: str, summary: str) -> None:
+        """Store a summary and purge expired ones."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO summaries (key, summary, created_at) VALUES (?, ?, ?)",
+                    (key, summary, now),
+                )
+                conn.execute(
+                    "DELETE FROM summaries WHERE created_at < ?", (now - self.ttl_seconds,)
+                )
+
+
+# Global summary store instance
+summary_store = SummaryStore(
+    os.path.join(settings.llm_cache_dir, "summaries.sqlite3"),
+    ttl_seconds=settings.summary_cache_ttl_seconds,
+)
@@ -1,8 +1,10 @@
 """Supervisor Agent using LangGraph for intelligent routing to specialized agents."""
-from typing import Annotated, Any, Dict, List, Optional, TypedDict
+from typing import Annotated, Any, Dict, List, Optional, Tuple, TypedDict
+from collections import OrderedDict
 from enum import Enum
 import asyncio
 import json
+import time
 
 from langchain_core.messages import AnyMessage, BaseMessage, HumanMessage
 from langchain_core.tools import BaseTool
@@ -11,6 +13,7 @@ from langgraph.graph import END, StateGraph
 from pydantic import BaseModel, Field
 
 from config.settings import settings
+from services.http_pool import shared_http_client
 
 
 class AgentDomain(str, Enum):
@@ -33,6 +36,37 @@ class AgentState(TypedDict):
     user_memories: Optional[Dict[str, Any]]
 
 
+class RoutingCache:
+    """Small LRU cache of routing decisions with a per-entry TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    @staticmethod
+    def key(user_id: str, message: str) -> Tuple[str, str]:
+        """Normalize a query into a cache key."""
+        return user_id, " ".join(message.lower().split())
+
+    def get(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, decision = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return decision
+
+    def set(self, key: Tuple[str, str], decision: Dict[str, Any]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, decision)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
 class SupervisorAgent:
     """
     Supervisor agent that routes requests to specialized domain agents.
@@ -48,7 +82,13 @@ class SupervisorAgent:
         """Initialize supervisor agent with routing logic."""
         self.domains = [domain.value for domain in AgentDomain]
         self.llm = self._init_llm()
+        self._classification_template = self._build_classification_template()
         self.graph = self._build_routing_graph()
+        self.routing_cache = RoutingCache(
+            maxsize=settings.routing_cache_size,
+            ttl_seconds=settings.routing_cache_ttl_seconds,
+        )
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
 
     def _init_llm(self):
         """Initialize the primary LLM for routing decisions."""
@@ -59,6 +99,7 @@ class SupervisorAgent:
             api_key=settings.groq_api,
             base_url="https://api.groq.com/openai/v1",
             temperature=0.3,  # Lower temp for routing decisions
+            http_async_client=shared_http_client,
         )
 
     def _build_routing_graph(self):
@@ -98,14 +139,9 @@ class SupervisorAgent:
 
         return workflow.compile()
 
-    async def _classify_domain(self, state: AgentState) -> Dict[str, Any]:
-        """
-        Classify user query to determine which specialized agent should handle it.
-        """
-        messages = state.get("messages", [])
-        last_message = messages[-1].content if messages else ""
-
-        classification_prompt = f"""
+    def _build_classification_template(self) -> str:
+        """Build the static classification prompt once; only the query varies per call."""
+        return f"""
         You are the Supervisor Agent responsible for routing user queries to the most appropriate specialized agent.
         
         Analyze the user query and classify it into PREDISELY one of these domains:
@@ -126,11 +162,18 @@ class SupervisorAgent:
         - "Apple stock analysis" -> finance
         - If the query is ambiguous or falls between categories, prioritize 'research'.
 
-        User Query: {last_message}
+        User Query: {{query}}
 
         Respond with ONLY the domain name (one word, lowercase). Do not add punctuation or explanation.
         """
 
+    async def _classify_domain(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Classify user query to determine which specialized agent should handle it.
+        """
+        last_message = state.get("last_message", "")
+        classification_prompt = self._classification_template.format(query=last_message)
+
         response = await self.llm.ainvoke([HumanMessage(content=classification_prompt)])
         domain = response.content.strip().lower()
 
@@ -225,6 +268,55 @@ class SupervisorAgent:
         Returns:
             Routing decision with recommended agent and context
         """
+        # Classification only depends on the message, so repeat queries skip the LLM
+        cache_key = self.routing_cache.key(user_id, message)
+        cached = self.routing_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        # Single-flight: concurrent duplicates (e.g. double submits) share one LLM call
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            try:
+                return dict(await asyncio.shield(inflight))
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if not inflight.cancelled() or (current and current.cancelling()):
+                    raise  # This request itself was cancelled
+                # The leading request was cancelled (e.g. its client went away);
+                # this one is still live, so route it again
+                return await self.route(message, user_id, conversation_history, user_memories)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            decision = await self._route_uncached(
+                message, user_id, conversation_history, user_memories
+            )
+        except asyncio.CancelledError:
+            # Don't hand our cancellation to followers; they retry on their own
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when there are no waiters
+            raise
+        else:
+            self.routing_cache.set(cache_key, decision)
+            future.set_result(decision)
+        finally:
+            del self._inflight[cache_key]
+
+        return dict(decision)
+
+    async def _route_uncached(
+        self,
+        message: str,
+        user_id: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        user_memories: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Run the routing graph for a message."""
         # Build initial state
         messages = [HumanMessage(content=message)]
         if conversation_history:
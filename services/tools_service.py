@@ -1,8 +1,14 @@
 """Tool integrations: SerpApi, Mem0, ChromaDB for specialized agents."""
+import asyncio
+import logging
 from typing import Dict, List, Any, Optional
 
+import httpx
+
 from config.settings import settings
 
+logger = logging.getLogger(__name__)
+
 
 class SerpApiService:
     """Service for SerpApi tool integrations (Google search, flights, jobs, recipes)."""
@@ -13,24 +19,41 @@ class SerpApiService:
             raise ValueError("SERPAPI_KEY not configured")
         self.api_key = settings.serpapi_key
         self.base_url = "https://serpapi.com"
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def open(self) -> None:
+        """Create the shared keep-alive HTTP client (no-op if already open)."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            )
+
+    async def close(self) -> None:
+        """Close the shared HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a SerpApi search request over the shared client."""
+        await self.open()
+        response = await self._client.get(f"{self.base_url}/search", params=params)
+        return response.json()
 
     async def search_news(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
         """Search for news articles."""
-        import httpx
-        async with httpx.AsyncClient() as client:
-            params = {
-                "q": query,
-                "tbm": "nws",
-                "api_key": self.api_key,
-                "num": num_results,
-            }
-            try:
-                response = await client.get(f"{self.base_url}/search", params=params)
-                data = response.json()
-                return data.get("news_results", [])
-            except Exception as e:
-                print(f"Error searching news: {e}")
-                return []
+        params = {
+            "q": query,
+            "tbm": "nws",
+            "api_key": self.api_key,
+            "num": num_results,
+        }
+        try:
+            data = await self._search(params)
+            return data.get("news_results", [])
+        except Exception as e:
+            logger.error("Error searching news: %s", e)
+            return []
 
     async def search_flights(
         self, 
@@ -40,23 +63,20 @@ class SerpApiService:
         num_results: int = 5
     ) -> List[Dict[str, Any]]:
         """Search for flight information."""
-        import httpx
-        async with httpx.AsyncClient() as client:
-            params = {
-                "engine": "google_flights",
-                "departure_id": departure,
-                "arrival_id": arrival,
-                "outbound_date": date,
-                "api_key": self.api_key,
-                "num": num_results,
-            }
-            try:
-                response = await client.get(f"{self.base_url}/search", params=params)
-                data = response.json()
-                return data.get("flights", [])
-            except Exception as e:
-                print(f"Error searching flights: {e}")
-                return []
+        params = {
+            "engine": "google_flights",
+            "departure_id": departure,
+            "arrival_id": arrival,
+            "outbound_date": date,
+            "api_key": self.api_key,
+            "num": num_results,
+        }
+        try:
+            data = await self._search(params)
+            return data.get("flights", [])
+        except Exception as e:
+            logger.error("Error searching flights: %s", e)
+            return []
 
     async def search_hotels(
         self,
@@ -66,44 +86,38 @@ class SerpApiService:
         num_results: int = 5
     ) -> List[Dict[str, Any]]:
         """Search for hotels."""
-        import httpx
-        async with httpx.AsyncClient() as client:
-            params = {
-                "engine": "google_hotels",
-                "q": location,
-                "check_in_date": check_in,
-                "check_out_date": check_out,
-                "api_key": self.api_key,
-                "num": num_results,
-            }
-            try:
-                response = await client.get(f"{self.base_url}/search", params=params)
-                data = response.json()
-                return data.get("hotels", [])
-            except Exception as e:
-                print(f"Error searching hotels: {e}")
-                return []
+        params = {
+            "engine": "google_hotels",
+            "q": location,
+            "check_in_date": check_in,
+            "check_out_date": check_out,
+            "api_key": self.api_key,
+            "num": num_results,
+        }
+        try:
+            data = await self._search(params)
+            return data.get("hotels", [])
+        except Exception as e:
+            logger.error("Error searching hotels: %s", e)
+            return []
 
     async def search_jobs(self, query: str, location: str = "", num_results: int = 5) -> List[Dict[str, Any]]:
         """Search for jobs using SerpApi Google Jobs."""
-        import httpx
-        async with httpx.AsyncClient() as client:
-            params = {
-                "engine": "google_jobs",
-                "q": query,
-                "api_key": self.api_key,
-                "num": num_results,
-            }
-            if location:
-                params["location"] = location
-                
-            try:
-                response = await client.get(f"{self.base_url}/search", params=params)
-                data = response.json()
-                return data.get("jobs_results", [])
-            except Exception as e:
-                print(f"Error searching jobs: {e}")
-                return []
+        params = {
+            "engine": "google_jobs",
+            "q": query,
+            "api_key": self.api_key,
+            "num": num_results,
+        }
+        if location:
+            params["location"] = location
+            
+        try:
+            data = await self._search(params)
+            return data.get("jobs_results", [])
+        except Exception as e:
+            logger.error("Error searching jobs: %s", e)
+            return []
 
     async def search_recipes(
         self, 
@@ -111,22 +125,19 @@ class SerpApiService:
         num_results: int = 5
     ) -> List[Dict[str, Any]]:
         """Search for recipes with ratings and ingredients."""
-        import httpx
-        async with httpx.AsyncClient() as client:
-            params = {
-                "q": query,
-                "tbm": "lcl",  # Local results which include recipes
-                "api_key": self.api_key,
-                "num": num_results,
-            }
-            try:
-                response = await client.get(f"{self.base_url}/search", params=params)
-                data = response.json()
-                # Return local/recipe results
-                return data.get("local_results", [])
-            except Exception as e:
-                print(f"Error searching recipes: {e}")
-                return []
+        params = {
+            "q": query,
+            "tbm": "lcl",  # Local results which include recipes
+            "api_key": self.api_key,
+            "num": num_results,
+        }
+        try:
+            data = await self._search(params)
+            # Return local/recipe results
+            return data.get("local_results", [])
+        except Exception as e:
+            logger.error("Error searching recipes: %s", e)
+            return []
 
 
 class Mem0Service:
@@ -147,14 +158,15 @@ class Mem0Service:
     ) -> Dict[str, Any]:
         """Add a memory for a user."""
         try:
-            result = self.client.add(
+            result = await asyncio.to_thread(
+                self.client.add,
                 messages=message,
                 user_id=user_id,
                 metadata=metadata or {}
             )
             return result if result else {}
         except Exception as e:
-            print(f"Error adding memory: {e}")
+            logger.error("Error adding memory: %s", e)
             return {}
 
     async def retrieve_memories(
@@ -169,21 +181,29 @@ class Mem0Service:
             # Passing filters as a dictionary is the standard way in many v2 SDKs.
             filters = {"user_id": user_id}
             
+            # The Mem0 SDK client is synchronous; run it in a worker thread so
+            # it does not block the event loop (and can overlap other awaits).
             if query:
-                results = self.client.search(query, filters=filters, limit=limit)
+                results = await asyncio.to_thread(
+                    self.client.search, query, filters=filters, limit=limit
+                )
             else:
                 # Use get_all with filters if strictly supported, or search with wildcard/generic query + filters
                 # If get_all doesn't accept filters in this SDK version, we fall back to search.
                 # Let's try get_all with filters first as per error hint.
                 try:
-                    results = self.client.get_all(filters=filters, limit=limit)
+                    results = await asyncio.to_thread(
+                        self.client.get_all, filters=filters, limit=limit
+                    )
                 except Exception:
                     # Fallback to search with a generic query if get_all fails
-                    results = self.client.search(query="*", filters=filters, limit=limit)
+                    results = await asyncio.to_thread(
+                        self.client.search, query="*", filters=filters, limit=limit
+                    )
             
             return results if results else []
         except Exception as e:
-            print(f"Error retrieving memories: {e}")
+            logger.error("Error retrieving memories: %s", e)
             return []
 
     async def delete_memory(
@@ -195,7 +215,7 @@ class Mem0Service:
             self.client.delete(memory_id)
             return True
         except Exception as e:
-            print(f"Error deleting memory: {e}")
+            logger.error("Error deleting memory: %s", e)
             return False
 
 
@@ -213,7 +233,7 @@ class ChromaDBService:
                 name=settings.chromadb_collection_name
             )
         except Exception as e:
-            print(f"Error initializing ChromaDB: {e}")
+            logger.error("Error initializing ChromaDB: %s", e)
             self.client = None
             self.collection = None
 
@@ -238,7 +258,7 @@ class ChromaDBService:
             )
             return True
         except Exception as e:
-            print(f"Error adding documents: {e}")
+            logger.error("Error adding documents: %s", e)
             return False
 
     async def query_documents(
@@ -251,7 +271,9 @@ class ChromaDBService:
             if not self.collection:
                 return []
                 
-            results = self.collection.query(
+            # ChromaDB is synchronous (embedding + index search); keep it off the event loop
+            results = await asyncio.to_thread(
+                self.collection.query,
                 query_texts=[query],
                 n_results=num_results
             )
@@ -267,7 +289,7 @@ class ChromaDBService:
             
             return formatted_results
         except Exception as e:
-            print(f"Error querying documents: {e}")
+            logger.error("Error querying documents: %s", e)
             return []
 
     async def generate_rag_response(
@@ -304,7 +326,7 @@ class ChromaDBService:
             
             return message.choices[0].message.content
         except Exception as e:
-            print(f"Error generating RAG response: {e}")
+            logger.error("Error generating RAG response: %s", e)
             return ""
 
 
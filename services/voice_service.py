@@ -1,7 +1,70 @@
 """Voice service for STT and TTS operations using Groq API."""
+import asyncio
 import io
-from typing import Optional
+import logging
+import re
+from typing import AsyncIterator, List, Optional, Tuple
 from config.settings import settings
+from services.http_pool import shared_http_client
+
+logger = logging.getLogger(__name__)
+
+# Sentence boundaries used to split long text into TTS segments
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_tts_segments(text: str, max_chars: int = 200) -> List[str]:
+    """
+    Group sentences into segments of roughly max_chars characters.
+
+    A single sentence longer than max_chars becomes its own segment.
+    """
+    segments: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if not sentence:
+            continue
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            segments.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        segments.append(current)
+    return segments
+
+
+# Leading magic bytes of the audio containers browsers and recorders produce
+_AUDIO_SIGNATURES = (
+    (b"OggS", ".ogg"),
+    (b"RIFF", ".wav"),
+    (b"\x1a\x45\xdf\xa3", ".webm"),
+    (b"ID3", ".mp3"),
+)
+
+
+def _guess_audio_extension(audio_bytes: bytes) -> str:
+    """Guess a file extension from the audio header (defaults to .wav)."""
+    header = audio_bytes[:12]
+    for signature, extension in _AUDIO_SIGNATURES:
+        if header.startswith(signature):
+            return extension
+    # Bare MPEG audio frame: 11 sync bits set and a non-zero layer
+    # (AAC ADTS shares the sync bits but has layer 00, e.g. FF F1 / FF F9)
+    if (
+        len(header) >= 2
+        and header[0] == 0xFF
+        and header[1] & 0xE0 == 0xE0
+        and header[1] & 0x06
+    ):
+        return ".mp3"
+    return ".wav"
+
+
+def _discard_task_result(task: asyncio.Task) -> None:
+    """Mark an abandoned task's outcome as retrieved."""
+    if not task.cancelled():
+        task.exception()
 
 
 class VoiceService:
@@ -14,12 +77,18 @@ class VoiceService:
         
         if settings.groq_api:
             from groq import AsyncGroq
-            self.groq_client = AsyncGroq(api_key=settings.groq_api.strip())
+            self.groq_client = AsyncGroq(
+                api_key=settings.groq_api.strip(),
+                http_client=shared_http_client,
+            )
         
         # OpenAI client for TTS (Groq doesn't have native TTS yet)
         if settings.openai_api_key:
             from openai import AsyncOpenAI
-            self.openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
+            self.openai_client = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                http_client=shared_http_client,
+            )
 
     async def transcribe_audio(self, audio_bytes: bytes) -> str:
         """
@@ -32,13 +101,14 @@ class VoiceService:
             Transcribed text
         """
         if not self.groq_client:
-            print("GROQ_API not configured for STT")
+            logger.warning("GROQ_API not configured for STT")
             return ""
 
         try:
             # Create a file-like object
             audio_file = io.BytesIO(audio_bytes)
-            audio_file.name = "audio.wav"  # Groq requires a filename
+            # Groq requires a filename and uses its extension to pick the decoder
+            audio_file.name = f"audio{_guess_audio_extension(audio_bytes)}"
             
             transcription = await self.groq_client.audio.transcriptions.create(
                 file=audio_file,
@@ -48,10 +118,10 @@ class VoiceService:
             )
             
             result = str(transcription).strip()
-            print(f"[STT] Transcribed: {result[:100]}...")
+            logger.debug("STT transcribed: %.100s", result)
             return result
         except Exception as e:
-            print(f"Error transcribing audio with Groq: {e}")
+            logger.error("Error transcribing audio with Groq: %s", e)
             return ""
 
     async def text_to_speech(self, text: str, voice: str = "alloy") -> Optional[bytes]:
@@ -66,31 +136,89 @@ class VoiceService:
         Returns:
             Audio bytes (mp3) or None
         """
-        if not text or not text.strip():
-            print("[TTS] No text provided")
+        try:
+            audio_bytes = b"".join([chunk async for chunk in self.stream_speech(text, voice)])
+        except Exception as e:
+            # OpenAI failed mid-stream; the partial clip is unusable on its own
+            logger.warning("Error with OpenAI TTS: %s, falling back to gTTS", e)
+            return await self._gtts_fallback(text)
+
+        if not audio_bytes:
             return None
+        logger.debug("TTS generated %d bytes of audio", len(audio_bytes))
+        return audio_bytes
+
+    async def stream_speech(self, text: str, voice: str = "alloy") -> AsyncIterator[bytes]:
+        """
+        Stream speech audio (mp3) as it is synthesized.
+
+        The first sentence group streams straight from OpenAI TTS while the
+        remaining groups are synthesized concurrently and follow in order
+        (MP3 frames can be concatenated into one playable stream). Falls back
+        to gTTS if OpenAI is not configured or fails before any audio is sent.
+        
+        Args:
+            text: Text to convert to speech
+            voice: Voice to use (alloy, echo, fable, onyx, nova, shimmer)
+            
+        Yields:
+            Chunks of mp3 audio
+        """
+        if not text or not text.strip():
+            logger.debug("TTS: no text provided")
+            return
             
         # Try OpenAI TTS first (higher quality)
         if self.openai_client:
+            logger.debug("TTS using OpenAI for text: %.50s", text)
+            segments = _split_tts_segments(text)
+            pending = [
+                asyncio.create_task(self._synthesize_openai(segment, voice))
+                for segment in segments[1:]
+            ]
+            yielded_any = False
             try:
-                print(f"[TTS] Using OpenAI TTS for text: {text[:50]}...")
-                response = await self.openai_client.audio.speech.create(
+                async with self.openai_client.audio.speech.with_streaming_response.create(
                     model="tts-1",
                     voice=voice,
-                    input=text,
+                    input=segments[0],
                     response_format="mp3"
-                )
-                
-                # Get the audio bytes
-                audio_bytes = response.content
-                print(f"[TTS] Generated {len(audio_bytes)} bytes of audio")
-                return audio_bytes
+                ) as response:
+                    async for chunk in response.iter_bytes(8192):
+                        yielded_any = True
+                        yield chunk
+
+                for task in pending:
+                    audio_bytes = await task
+                    yielded_any = True
+                    yield audio_bytes
+                return
                 
             except Exception as e:
-                print(f"Error with OpenAI TTS: {e}, falling back to gTTS")
+                if yielded_any:
+                    raise
+                logger.warning("Error with OpenAI TTS: %s, falling back to gTTS", e)
+            finally:
+                for task in pending:
+                    task.cancel()
+                    # Retrieve errors of segments that already failed (cancel() does
+                    # nothing to a finished task); the failure that matters was handled above
+                    task.add_done_callback(_discard_task_result)
         
         # Fallback to gTTS (free but lower quality)
-        return await self._gtts_fallback(text)
+        audio_bytes = await self._gtts_fallback(text)
+        if audio_bytes:
+            yield audio_bytes
+
+    async def _synthesize_openai(self, text: str, voice: str) -> bytes:
+        """Synthesize one segment with OpenAI TTS and return the whole mp3."""
+        async with self.openai_client.audio.speech.with_streaming_response.create(
+            model="tts-1",
+            voice=voice,
+            input=text,
+            response_format="mp3"
+        ) as response:
+            return await response.read()
     
     async def _gtts_fallback(self, text: str) -> Optional[bytes]:
         """
@@ -103,50 +231,80 @@ class VoiceService:
             Audio bytes or None
         """
         try:
-            from gtts import gTTS
+            import gtts  # noqa: F401  (fail fast if gTTS is not installed)
 
-            print(f"[TTS] Using gTTS fallback for text: {text[:50]}...")
+            logger.debug("TTS using gTTS fallback for text: %.50s", text)
 
-            # Try different configurations if the first fails
+            # Race the normal-speed tld variants (a failing tld no longer costs its
+            # full timeout before the next); slow speech stays a last resort
             configs = [
                 {'lang': 'en', 'slow': False, 'tld': 'com'},
                 {'lang': 'en', 'slow': False, 'tld': 'co.uk'},
-                {'lang': 'en', 'slow': True, 'tld': 'com'},  # Slower but clearer
             ]
+            slow_config = {'lang': 'en', 'slow': True, 'tld': 'com'}  # Slower but clearer
 
-            last_error = None
-            for config in configs:
-                try:
-                    # Create a file-like object
-                    fp = io.BytesIO()
+            audio_bytes, last_error = await self._race_gtts(text, configs)
+            if audio_bytes is None:
+                audio_bytes, slow_error = await self._race_gtts(text, [slow_config])
+                last_error = slow_error or last_error
+            if audio_bytes is not None:
+                return audio_bytes
 
-                    # Generate speech
-                    tts = gTTS(text=text, **config)
-                    tts.write_to_fp(fp)
+            # If all configs failed
+            logger.error("TTS all gTTS configurations failed. Last error: %s", last_error)
+            return None
 
-                    # Get bytes
-                    fp.seek(0)
-                    audio_bytes = fp.getvalue()
+        except Exception as e:
+            logger.error("TTS error with gTTS fallback: %s", e)
+            return None
 
-                    if audio_bytes and len(audio_bytes) > 1000:  # Ensure we got real audio
-                        print(f"[TTS] Generated {len(audio_bytes)} bytes via gTTS (tld: {config.get('tld', 'com')})")
-                        return audio_bytes
-                    else:
-                        print(f"[TTS] gTTS returned empty or too small audio ({len(audio_bytes) if audio_bytes else 0} bytes)")
-                        continue
+    async def _race_gtts(
+        self, text: str, configs: List[dict]
+    ) -> Tuple[Optional[bytes], Optional[Exception]]:
+        """
+        Synthesize with several gTTS configurations concurrently.
 
+        Returns:
+            The first real audio (or None) and the last error seen
+        """
+        async def attempt(config: dict):
+            audio_bytes = await asyncio.to_thread(self._synthesize_gtts, text, config)
+            return config, audio_bytes
+
+        tasks = [asyncio.create_task(attempt(config)) for config in configs]
+        last_error = None
+        try:
+            for future in asyncio.as_completed(tasks):
+                try:
+                    config, audio_bytes = await future
                 except Exception as config_error:
                     last_error = config_error
-                    print(f"[TTS] gTTS config failed (tld: {config.get('tld', 'com')}): {config_error}")
+                    logger.warning("TTS gTTS config failed: %s", config_error)
                     continue
 
-            # If all configs failed
-            print(f"[TTS] All gTTS configurations failed. Last error: {last_error}")
-            return None
+                if audio_bytes and len(audio_bytes) > 1000:  # Ensure we got real audio
+                    logger.debug("TTS generated %d bytes via gTTS (tld: %s, slow: %s)", len(audio_bytes), config.get('tld', 'com'), config.get('slow'))
+                    return audio_bytes, last_error
+                logger.warning("TTS gTTS returned empty or too small audio (%d bytes)", len(audio_bytes) if audio_bytes else 0)
+        finally:
+            # Worker threads cannot be interrupted, but their results are dropped
+            for task in tasks:
+                task.cancel()
+        return None, last_error
 
-        except Exception as e:
-            print(f"[TTS] Error with gTTS fallback: {e}")
-            return None
+    @staticmethod
+    def _synthesize_gtts(text: str, config: dict) -> bytes:
+        """Synchronously synthesize speech with gTTS for one configuration."""
+        from gtts import gTTS
+
+        # Create a file-like object
+        fp = io.BytesIO()
+
+        # Generate speech
+        tts = gTTS(text=text, **config)
+        tts.write_to_fp(fp)
+
+        return fp.getvalue()
 
 
 # Global instance